@@ -1,59 +1,293 @@
 import os
 import io
+import glob
 import json
+import time
+import queue
 import secrets
+import threading
+import functools
+import importlib.util
 import numpy as np
 from datetime import datetime
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for, Response, stream_with_context
-from tensorflow.keras.models import load_model
-from tensorflow.keras.applications.mobilenet_v2 import preprocess_input
-from PIL import Image
-import tensorflow as tf
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, Response, stream_with_context, send_file
+import cv2
+import httpx
+from cachelib import FileSystemCache
 from groq import Groq
 from dotenv import load_dotenv
 
+try:
+    import cpuinfo
+except ImportError:
+    cpuinfo = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+# ─── Runtime Tuning ───────────────────────────────────────────────────────────
+# TF defaults to one intra-op thread per logical core, which oversubscribes
+# SMT siblings. These environment variables must be set before TF is imported.
+
+PHYSICAL_CORES = (psutil.cpu_count(logical=False) if psutil else None) or os.cpu_count()
+os.environ.setdefault('OMP_NUM_THREADS', str(PHYSICAL_CORES))
+os.environ.setdefault('TF_ENABLE_ONEDNN_OPTS', '1')
+
+from tensorflow.keras.models import load_model  # noqa: E402
+import tensorflow as tf  # noqa: E402
+
+tf.config.threading.set_intra_op_parallelism_threads(PHYSICAL_CORES)
+tf.config.threading.set_inter_op_parallelism_threads(2)
+
 # Import the enhanced report generator
 from report_generator import generate_enhanced_report
 
 load_dotenv()
 
-# Configure Groq
-groq_client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
+# Configure Groq with one pooled, keep-alive HTTP client shared by all requests.
+# HTTP/2 needs the optional h2 package.
+GROQ_TIMEOUT = httpx.Timeout(connect=5, read=60, write=10, pool=5)
+groq_client = Groq(
+    api_key=os.environ.get("GROQ_API_KEY"),
+    timeout=GROQ_TIMEOUT,
+    http_client=httpx.Client(
+        http2=importlib.util.find_spec('h2') is not None,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        timeout=GROQ_TIMEOUT,
+    ),
+)
 
 app = Flask(__name__)
 app.secret_key = secrets.token_hex(16)
 
 # Configuration
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-UPLOAD_FOLDER = os.path.join(BASE_DIR, 'uploads')
 STATIC_FOLDER = os.path.join(BASE_DIR, 'static', 'images')
 MODEL_PATH = os.path.join(BASE_DIR, 'mobilenetv2_best.keras')
+TFLITE_MODEL_PATHS = {
+    'int8': os.path.join(BASE_DIR, 'mobilenetv2_best_int8_top1.tflite'),
+    'fp16': os.path.join(BASE_DIR, 'mobilenetv2_best_fp16_top1.tflite'),
+}
+ONNX_MODEL_PATHS = {
+    'int8': os.path.join(BASE_DIR, 'mobilenetv2_best_int8_top1.onnx'),
+    'fp32': os.path.join(BASE_DIR, 'mobilenetv2_best_fp32_top1.onnx'),
+}
+# 'onnx' or 'tflite'; ONNX Runtime is preferred whenever it is installed, and
+# TFLite is used if the ONNX model can't be exported or loaded
+INFERENCE_BACKEND = os.environ.get('INFERENCE_BACKEND', 'onnx' if ort else 'tflite')
+INT8_CPU_FLAGS = {'avx512_vnni', 'avx_vnni'}
+CALIB_DIR = os.path.join(BASE_DIR, 'calib')
+CALIB_MAX_IMAGES = 100
 CLASS_NAMES_PATH = os.path.join(BASE_DIR, 'class_names.json')
 IMG_SIZE = (224, 224)
+THUMBNAIL_MAX = 512
+# Set PREDICT_BATCH_SIZE=1 to run inference on the request threads instead
+BATCH_SIZE = int(os.environ.get('PREDICT_BATCH_SIZE', 8))
+BATCH_TIMEOUT_MS = 20
+PREDICT_TIMEOUT_S = 2
+# Threads per TFLite interpreter / ONNX Runtime session; keep this x workers
+# near the core count (gunicorn_conf.py sets it per worker)
+INFERENCE_THREADS = int(os.environ.get('INFERENCE_THREADS', PHYSICAL_CORES if BATCH_SIZE > 1 else 2))
 
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['STATIC_FOLDER'] = STATIC_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max
+SESSION_TTL_S = 3600
+DIAGNOSIS_DIR = os.path.join(BASE_DIR, '.diagnoses')
 
 # Create directories
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(STATIC_FOLDER, exist_ok=True)
 
 # Load model and class names globally
-model = None
+onnx_model_path = None
+onnx_session = None
+onnx_input_name = None
+tflite_model = None
+input_index = None
+class_index = None
+confidence_index = None
+input_lut = None
 class_names = []
+parsed_classes = []  # (plant, condition, is_healthy) per class index
 
 
 # ─── Model Loading ────────────────────────────────────────────────────────────
 
+@functools.lru_cache(maxsize=None)
+def cpu_flags():
+    if cpuinfo is None:
+        return frozenset()
+    return frozenset(cpuinfo.get_cpu_info().get('flags', []))
+
+
+def _calibration_images():
+    return sorted(glob.glob(os.path.join(CALIB_DIR, '*.jpg')))[:CALIB_MAX_IMAGES]
+
+
+def _representative_dataset():
+    for path in _calibration_images():
+        yield [_to_float_input(_resize_rgb(cv2.imread(path, cv2.IMREAD_COLOR)))]
+
+
+def _input_lut(input_details):
+    """Map every uint8 pixel value straight to its quantized int8 model input."""
+    scale, zero_point = input_details['quantization']
+    pixels = np.arange(256, dtype=np.float32) / 127.5 - 1.0
+    return np.clip(np.round(pixels / scale + zero_point), -128, 127).astype(np.int8)
+
+
+def _serving_function(keras_model):
+    """Inference-only graph returning the top-1 class and its probability per image."""
+    @tf.function(input_signature=[tf.TensorSpec([None, IMG_SIZE[1], IMG_SIZE[0], 3], tf.float32)])
+    def infer(x):
+        probs = keras_model(x, training=False)
+        return tf.argmax(probs, axis=-1, output_type=tf.int32), tf.reduce_max(probs, axis=-1)
+    return infer
+
+
+def quantization_mode():
+    """Full-integer INT8 needs VNNI to beat float; otherwise use FP16 weights."""
+    if cpu_flags() & INT8_CPU_FLAGS and _calibration_images():
+        return 'int8'
+    return 'fp16'
+
+
+def load_tflite_model():
+    """Return the TFLite flatbuffer, converting the Keras model on first run.
+
+    On CPUs with VNNI and with calibration images in CALIB_DIR the model is
+    converted with full-integer INT8 post-training quantization; elsewhere
+    weights are stored as FP16 and inputs/outputs stay float32. Dynamic-range
+    quantization is deliberately not used: it is slower than float32 on CPU.
+    """
+    mode = quantization_mode()
+    path = TFLITE_MODEL_PATHS[mode]
+    if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(MODEL_PATH):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    # The model is only traced for conversion; skip XLA auto-clustering
+    tf.config.optimizer.set_jit(False)
+    keras_model = load_model(MODEL_PATH)
+    converter = tf.lite.TFLiteConverter.from_concrete_functions(
+        [_serving_function(keras_model).get_concrete_function()], keras_model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if mode == 'int8':
+        converter.representative_dataset = _representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+    else:
+        converter.target_spec.supported_types = [tf.float16]
+    tflite_bytes = converter.convert()
+    with open(path, 'wb') as f:
+        f.write(tflite_bytes)
+    print(f"Converted {MODEL_PATH} to {mode} model {path}")
+    return tflite_bytes
+
+
+def _quantize_onnx(float_path, int8_path):
+    from onnxruntime.quantization import CalibrationDataReader, quantize_static
+
+    class CalibrationReader(CalibrationDataReader):
+        def __init__(self, input_name):
+            self._feeds = ({input_name: batch[0]} for batch in _representative_dataset())
+
+        def get_next(self):
+            return next(self._feeds, None)
+
+    input_name = ort.InferenceSession(float_path, providers=['CPUExecutionProvider']).get_inputs()[0].name
+    quantize_static(float_path, int8_path, CalibrationReader(input_name))
+
+
+def load_onnx_model():
+    """Return the path of the ONNX model, exporting it from Keras on first run.
+
+    The INT8 model is statically quantized from the same calibration set as
+    the TFLite path and is used under the same conditions.
+    """
+    mode = 'int8' if quantization_mode() == 'int8' else 'fp32'
+    path = ONNX_MODEL_PATHS[mode]
+    if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(MODEL_PATH):
+        return path
+
+    float_path = ONNX_MODEL_PATHS['fp32']
+    if not (os.path.exists(float_path) and
+            os.path.getmtime(float_path) >= os.path.getmtime(MODEL_PATH)):
+        import tf2onnx
+        tf.config.optimizer.set_jit(False)
+        infer = _serving_function(load_model(MODEL_PATH))
+        tf2onnx.convert.from_function(infer, input_signature=infer.input_signature,
+                                      opset=17, output_path=float_path)
+        print(f"Exported {MODEL_PATH} to ONNX model {float_path}")
+    if mode == 'int8':
+        _quantize_onnx(float_path, path)
+        print(f"Quantized {float_path} to {path}")
+    return path
+
+
+def _start_onnx():
+    global onnx_session, onnx_input_name
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = INFERENCE_THREADS
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    onnx_session = ort.InferenceSession(onnx_model_path, sess_options=options,
+                                        providers=['CPUExecutionProvider'])
+    onnx_input_name = onnx_session.get_inputs()[0].name
+    onnx_session.run(None, {onnx_input_name: np.zeros((1, IMG_SIZE[1], IMG_SIZE[0], 3), np.float32)})
+
+
+def _start_tflite():
+    global input_index, class_index, confidence_index, input_lut
+    # Only read the tensor layout here; the interpreters that run inference
+    # are per thread (see _get_interpreter)
+    interpreter = tf.lite.Interpreter(model_content=tflite_model)
+    input_details = interpreter.get_input_details()[0]
+    input_index = input_details['index']
+    input_lut = _input_lut(input_details) if input_details['dtype'] == np.int8 else None
+    # Output order isn't guaranteed by the converter; tell them apart by dtype
+    for details in interpreter.get_output_details():
+        if details['dtype'] == np.int32:
+            class_index = details['index']
+        else:
+            confidence_index = details['index']
+
+
+def _warm_up(interpreter):
+    """Run one dummy inference to pay for delegate setup and weight packing."""
+    input_details = interpreter.get_input_details()[0]
+    interpreter.set_tensor(input_index, np.zeros(input_details['shape'], input_details['dtype']))
+    interpreter.invoke()
+
+
 def load_model_and_classes():
-    global model, class_names
+    """Convert/load the model file and class names; no inference runtime yet.
+
+    Under gunicorn this runs in the preloading master. ONNX Runtime sessions
+    and TFLite interpreters own thread pools that don't survive fork, so they
+    are only created per process by start_inference().
+    """
+    global onnx_model_path, tflite_model, class_names, parsed_classes
     try:
-        model = load_model(MODEL_PATH)
-        print(f"Model loaded successfully from {MODEL_PATH}")
+        if INFERENCE_BACKEND == 'onnx':
+            try:
+                onnx_model_path = load_onnx_model()
+                print(f"Model loaded successfully from {onnx_model_path}")
+            except Exception as e:
+                print(f"Error loading ONNX model, falling back to TFLite: {e}")
+                onnx_model_path = None
+        if onnx_model_path is None:
+            tflite_model = load_tflite_model()
+            print(f"Model loaded successfully from {TFLITE_MODEL_PATHS[quantization_mode()]}")
     except Exception as e:
         print(f"Error loading model: {e}")
-        model = None
+        onnx_model_path = None
+        tflite_model = None
 
     try:
         with open(CLASS_NAMES_PATH, 'r') as f:
@@ -81,18 +315,194 @@ def load_model_and_classes():
             "Tomato___Target_Spot", "Tomato___Tomato_Yellow_Leaf_Curl_Virus",
             "Tomato___Tomato_mosaic_virus", "Tomato___healthy"
         ]
+    parsed_classes = [parse_class_name(c) for c in class_names]
 
 
 # ─── Image Processing ─────────────────────────────────────────────────────────
 
-def preprocess_image(filepath):
-    with Image.open(filepath) as img:
-        img_rgb = img.convert('RGB')
-        img_resized = img_rgb.resize(IMG_SIZE)
-        img_array = np.array(img_resized)
-    img_array = np.expand_dims(img_array, axis=0)
-    img_array = preprocess_input(img_array.astype(np.float32))
-    return img_array
+def decode_image(raw):
+    """Decode uploaded image bytes to a BGR array without touching disk."""
+    img = cv2.imdecode(np.frombuffer(raw, np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError("Could not read image file")
+    return img
+
+
+def _resize_rgb(img):
+    # Resize before the colour swap so cvtColor only touches 224x224 pixels
+    img = cv2.resize(img, IMG_SIZE, interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+
+def _to_float_input(img):
+    # MobileNetV2 preprocess_input (x / 127.5 - 1) written straight into the
+    # batch buffer. Allocated per call: Flask serves requests on threads.
+    buf = np.empty((1, IMG_SIZE[1], IMG_SIZE[0], 3), dtype=np.float32)
+    np.multiply(img, np.float32(1.0 / 127.5), out=buf[0], casting='unsafe')
+    buf -= np.float32(1.0)
+    return buf
+
+
+def preprocess_image(img):
+    img = _resize_rgb(img)
+    if input_lut is not None:
+        return input_lut[img][None, ...]
+    return _to_float_input(img)
+
+
+def save_static_copy(img):
+    """Save a display-sized copy of the decoded upload; return its static path.
+
+    The longest side is capped at THUMBNAIL_MAX. A WebP sibling is written
+    next to the JPEG for browsers that accept it.
+    """
+    h, w = img.shape[:2]
+    scale = THUMBNAIL_MAX / max(h, w)
+    if scale < 1:
+        img = cv2.resize(img, (max(1, round(w * scale)), max(1, round(h * scale))),
+                         interpolation=cv2.INTER_AREA)
+
+    static_name = f"upload_{secrets.token_hex(8)}"
+    static_path = os.path.join(app.config['STATIC_FOLDER'], static_name)
+    cv2.imwrite(static_path + '.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, 82,
+                                            cv2.IMWRITE_JPEG_OPTIMIZE, 1,
+                                            cv2.IMWRITE_JPEG_PROGRESSIVE, 1])
+    cv2.imwrite(static_path + '.webp', img, [cv2.IMWRITE_WEBP_QUALITY, 80])
+    return f'images/{static_name}.jpg'
+
+
+# ─── Batched Inference ────────────────────────────────────────────────────────
+
+_batch_queue = queue.Queue()
+_batcher_started = False
+_batcher_lock = threading.Lock()
+_tls = threading.local()
+
+
+def _get_interpreter(batch_size):
+    """Per-thread interpreter for batch_size, sharing the one model flatbuffer.
+
+    tf.lite.Interpreter is not thread-safe, so each thread that runs
+    inference gets its own instead of serialising on a lock.
+    """
+    interpreters = getattr(_tls, 'interpreters', None)
+    if interpreters is None:
+        interpreters = _tls.interpreters = {}
+    interpreter = interpreters.get(batch_size)
+    if interpreter is None:
+        # Recent TF builds run float and FP16-weight graphs through XNNPACK by default
+        interpreter = tf.lite.Interpreter(model_content=tflite_model,
+                                          num_threads=INFERENCE_THREADS)
+        if batch_size != 1:
+            interpreter.resize_tensor_input(input_index, [batch_size, IMG_SIZE[1], IMG_SIZE[0], 3])
+        interpreter.allocate_tensors()
+        interpreters[batch_size] = interpreter
+    return interpreter
+
+
+def _run_batch(img_batch):
+    if onnx_session is not None:
+        # InferenceSession.run is thread-safe; outputs follow the serving function
+        class_ids, confidences = onnx_session.run(None, {onnx_input_name: img_batch})
+        return class_ids, confidences
+    interpreter = _get_interpreter(len(img_batch))
+    interpreter.set_tensor(input_index, img_batch)
+    interpreter.invoke()
+    return interpreter.get_tensor(class_index), interpreter.get_tensor(confidence_index)
+
+
+def _batch_worker():
+    """Collect up to BATCH_SIZE requests or BATCH_TIMEOUT_MS, run them as one batch."""
+    if onnx_session is None:
+        # This thread runs every TFLite batch, so build and warm its
+        # interpreters for all batch sizes before taking requests
+        try:
+            for batch_size in range(1, BATCH_SIZE + 1):
+                _warm_up(_get_interpreter(batch_size))
+        except Exception as e:
+            print(f"Error warming up TFLite interpreters: {e}")
+
+    while True:
+        batch = [_batch_queue.get()]
+        deadline = time.monotonic() + BATCH_TIMEOUT_MS / 1000
+        while len(batch) < BATCH_SIZE:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(_batch_queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+
+        try:
+            class_ids, confidences = _run_batch(
+                np.concatenate([img_array for img_array, _, _ in batch]))
+            for (_, _, result), class_id, conf in zip(batch, class_ids, confidences):
+                result['top1'] = (class_id, conf)
+        except Exception as e:
+            for _, _, result in batch:
+                result['error'] = e
+        for _, done, _ in batch:
+            done.set()
+
+
+def _ensure_batcher():
+    global _batcher_started
+    if _batcher_started:
+        return
+    with _batcher_lock:
+        if not _batcher_started:
+            threading.Thread(target=_batch_worker, name='predict-batcher', daemon=True).start()
+            _batcher_started = True
+
+
+_inference_started = False
+_inference_lock = threading.Lock()
+
+
+def start_inference():
+    """Start this process's inference backend.
+
+    The ONNX Runtime session is created and warmed up here. TFLite
+    interpreters belong to the thread that runs them: with batching on, the
+    batch thread is started here and warms its own before taking requests;
+    with PREDICT_BATCH_SIZE=1 each request thread builds one on first use.
+
+    Called from gunicorn's post_fork (gunicorn_conf.py) and before app.run;
+    any other server starts it lazily on the first prediction.
+    """
+    global _inference_started, onnx_session, tflite_model
+    if _inference_started:
+        return
+    with _inference_lock:
+        if not _inference_started:
+            if onnx_model_path is not None:
+                try:
+                    _start_onnx()
+                except Exception as e:
+                    # The cached .onnx file is only opened here (stale, corrupt,
+                    # or an opset/op this onnxruntime can't run)
+                    print(f"Error starting ONNX model, falling back to TFLite: {e}")
+                    onnx_session = None
+            if onnx_session is None:
+                if tflite_model is None:
+                    tflite_model = load_tflite_model()
+                _start_tflite()
+            if BATCH_SIZE > 1:
+                _ensure_batcher()
+            _inference_started = True
+
+
+def _predict_batched(img_array):
+    _ensure_batcher()
+    done = threading.Event()
+    result = {}
+    _batch_queue.put((img_array, done, result))
+    if not done.wait(PREDICT_TIMEOUT_S):
+        raise TimeoutError("Prediction timed out")
+    if 'error' in result:
+        raise result['error']
+    return result['top1']
 
 
 def parse_class_name(raw_class):
@@ -103,15 +513,24 @@ def parse_class_name(raw_class):
     return plant, condition, is_healthy
 
 
-def predict_image(filepath):
-    if model is None:
+def predict_image(img):
+    if onnx_model_path is None and tflite_model is None:
         raise ValueError("Model not loaded")
-    img_array = preprocess_image(filepath)
-    predictions = model.predict(img_array, verbose=0)
-    predicted_idx = int(np.argmax(predictions[0]))
-    confidence = float(np.max(predictions[0])) * 100
-    raw_class = class_names[predicted_idx] if predicted_idx < len(class_names) else "Unknown"
-    plant_type, condition, is_healthy = parse_class_name(raw_class)
+    start_inference()
+    img_array = preprocess_image(img)
+    if BATCH_SIZE > 1:
+        class_id, conf = _predict_batched(img_array)
+    else:
+        class_ids, confidences = _run_batch(img_array)
+        class_id, conf = class_ids[0], confidences[0]
+    predicted_idx = int(class_id)
+    confidence = float(conf) * 100
+    if predicted_idx < len(class_names):
+        raw_class = class_names[predicted_idx]
+        plant_type, condition, is_healthy = parsed_classes[predicted_idx]
+    else:
+        raw_class = "Unknown"
+        plant_type, condition, is_healthy = parse_class_name(raw_class)
 
     if is_healthy:
         recommendations = [
@@ -158,16 +577,105 @@ Always be encouraging and solution-focused rather than alarmist.
 If the plant is healthy, provide maintenance tips and early warning signs to watch for."""
 
 
+def build_class_context(raw_class: str) -> str:
+    plant_type, condition, is_healthy = parse_class_name(raw_class)
+    return (
+        f"Plant: {plant_type}\n"
+        f"Condition: {condition}\n"
+        f"Status: {'Healthy' if is_healthy else 'Disease Detected'}\n"
+        f"Classification: {raw_class}"
+    )
+
+
 def build_plant_context(prediction: dict) -> str:
     return (
-        f"Plant: {prediction['plant_type']}\n"
-        f"Condition: {prediction['condition']}\n"
-        f"Status: {'Healthy' if prediction['is_healthy'] else 'Disease Detected'}\n"
-        f"Classification: {prediction['raw_class']}\n"
+        f"{build_class_context(prediction['raw_class'])}\n"
         f"Model Confidence: {prediction['confidence']}%"
     )
 
 
+LEARN_PANELS = ('overview', 'prevention', 'damage')
+
+
+@functools.lru_cache(maxsize=len(LEARN_PANELS) * 38)
+def learn_panel_content(raw_class: str, panel: str) -> str:
+    """Groq write-up for a /learn panel.
+
+    The prompt depends only on the class and panel, so answers are cached
+    per (raw_class, panel). There are 38 classes x 3 panels.
+    """
+    plant_context = build_class_context(raw_class)
+
+    panel_prompts = {
+        'overview': (
+            f"Given this plant diagnosis:\n{plant_context}\n\n"
+            "Provide a detailed overview with these sections:\n"
+            "1. **What is it?** - Explain the disease/condition, its scientific name if applicable, and biological cause\n"
+            "2. **How it spreads** - Transmission vectors, environmental conditions that favour it\n"
+            "3. **Visual symptoms** - Detailed description of what to look for beyond what was detected\n"
+            "4. **Severity assessment** - How serious is this for the plant and surrounding crops?\n\n"
+            "Format using markdown. Be thorough but accessible."
+        ),
+        'prevention': (
+            f"Given this plant diagnosis:\n{plant_context}\n\n"
+            "Provide comprehensive prevention guidance with these sections:\n"
+            "1. **Immediate actions** - What to do right now\n"
+            "2. **Cultural practices** - Watering, spacing, pruning, sanitation\n"
+            "3. **Environmental controls** - Humidity, temperature, airflow management\n"
+            "4. **Resistant varieties** - Suggest disease-resistant cultivars where applicable\n"
+            "5. **Organic treatments** - Natural/biological control methods\n"
+            "6. **Chemical treatments** - Fungicides/pesticides (active ingredients, not brand names)\n"
+            "7. **Monitoring schedule** - How often to inspect and what to track\n\n"
+            "Format using markdown. Include specific, actionable steps."
+        ),
+        'damage': (
+            f"Given this plant diagnosis:\n{plant_context}\n\n"
+            "Provide a detailed future damage and risk assessment with these sections:\n"
+            "1. **Short-term impact (1-2 weeks)** - What will happen if untreated\n"
+            "2. **Medium-term impact (1-3 months)** - Disease progression timeline\n"
+            "3. **Long-term consequences** - Permanent damage, plant death risk\n"
+            "4. **Spread risk** - Which nearby plants/crops are vulnerable\n"
+            "5. **Yield/economic impact** - Estimated losses for commercial growers\n"
+            "6. **Environmental factors** - Conditions that accelerate damage\n"
+            "7. **Recovery prognosis** - Can the plant fully recover? Under what conditions?\n\n"
+            "Format using markdown. Be realistic but solution-focused."
+        )
+    }
+
+    response = groq_client.chat.completions.create(
+        model="llama-3.3-70b-versatile",
+        max_tokens=1500,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": panel_prompts[panel]}
+        ]
+    )
+    return response.choices[0].message.content
+
+
+# ─── Diagnosis Store ──────────────────────────────────────────────────────────
+# The prediction lives server-side; the signed session cookie only carries a
+# short token, so it isn't re-serialised and re-signed on every response.
+# Kept on disk so every gunicorn worker sees the same diagnoses.
+
+_diagnosis_store = FileSystemCache(DIAGNOSIS_DIR, threshold=10000, default_timeout=SESSION_TTL_S)
+
+
+def save_diagnosis(prediction, image_path):
+    token = secrets.token_urlsafe(12)
+    _diagnosis_store.set(token, {'prediction': prediction, 'image_path': image_path})
+    session['t'] = token
+
+
+def get_diagnosis():
+    """Return (prediction, image_path) for this session, or (None, None)."""
+    token = session.get('t')
+    data = _diagnosis_store.get(token) if token else None
+    if not data:
+        return None, None
+    return data['prediction'], data['image_path']
+
+
 # ─── ROUTES ───────────────────────────────────────────────────────────────────
 
 @app.route('/')
@@ -195,40 +703,28 @@ def predict():
         return jsonify({'error': 'No file selected'}), 400
 
     if file:
-        filename = secrets.token_hex(8) + os.path.splitext(file.filename)[1]
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
-
         try:
-            prediction = predict_image(filepath)
+            # MAX_CONTENT_LENGTH bounds the in-memory upload at 16MB
+            img = decode_image(file.read())
+            prediction = predict_image(img)
+            save_diagnosis(prediction, save_static_copy(img))
 
-            static_filename = f"upload_{secrets.token_hex(8)}.jpg"
-            static_path = os.path.join(app.config['STATIC_FOLDER'], static_filename)
-            with Image.open(filepath) as img:
-                img.convert('RGB').save(static_path)
-
-            session['prediction'] = prediction
-            session['image_path'] = f'images/{static_filename}'
-
-            os.remove(filepath)
             return jsonify({'success': True})
 
         except Exception as e:
-            if os.path.exists(filepath):
-                try:
-                    os.remove(filepath)
-                except Exception:
-                    pass
             return jsonify({'error': str(e)}), 500
 
 
 @app.route('/result')
 def result():
-    prediction = session.get('prediction')
-    image_path = session.get('image_path')
+    prediction, image_path = get_diagnosis()
     if not prediction:
         return redirect(url_for('upload'))
-    return render_template('result.html', prediction=prediction, image_path=image_path)
+    webp_path = os.path.splitext(image_path)[0] + '.webp' if image_path else None
+    if webp_path and not os.path.exists(os.path.join(BASE_DIR, 'static', webp_path)):
+        webp_path = None
+    return render_template('result.html', prediction=prediction, image_path=image_path,
+                           webp_path=webp_path)
 
 
 # ─── PDF REPORT ───────────────────────────────────────────────────────────────
@@ -236,36 +732,36 @@ def result():
 @app.route('/report')
 def report():
     """Generate and download the enhanced PDF diagnosis report."""
-    prediction = session.get('prediction')
-    image_path = session.get('image_path')
+    prediction, image_path = get_diagnosis()
     
     if not prediction:
         return redirect(url_for('upload'))
 
-    # Prepare absolute path for the image (required by ReportLab)
+    # Prepare absolute path for the image (required by ReportLab). The static
+    # copy is already capped at THUMBNAIL_MAX, so ReportLab embeds a small JPEG.
     abs_image_path = None
     if image_path:
         abs_image_path = os.path.join(BASE_DIR, 'static', image_path)
 
     try:
-        # Generate the PDF using the enhanced generator
-        pdf_bytes = generate_enhanced_report(
+        # Generate the PDF into a buffer that send_file streams out in chunks
+        buf = io.BytesIO()
+        generate_enhanced_report(
             plant=prediction['plant_type'],
             condition=prediction['condition'],
             confidence=prediction['confidence'],
-            image_path=abs_image_path
+            image_path=abs_image_path,
+            out_stream=buf,
         )
-        
+        buf.seek(0)
+
         # Create a clean filename
         plant_fn = prediction['plant_type'].replace(' ', '_')
         cond_fn = prediction['condition'].replace(' ', '_')
         filename = f"PlantCare_Report_{plant_fn}_{cond_fn}.pdf"
-        
-        return Response(
-            pdf_bytes,
-            mimetype='application/pdf',
-            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
-        )
+
+        return send_file(buf, mimetype='application/pdf', as_attachment=True,
+                         download_name=filename)
 
     except ValueError as e:
         # Fallback if the disease is not in report_generator.DISEASE_DATA
@@ -278,61 +774,15 @@ def report():
 
 @app.route('/learn', methods=['POST'])
 def learn():
-    prediction = session.get('prediction')
+    prediction, _ = get_diagnosis()
     if not prediction:
         return jsonify({'error': 'No active prediction in session'}), 400
 
     panel = request.json.get('panel', 'overview')
-    plant_context = build_plant_context(prediction)
-
-    panel_prompts = {
-        'overview': (
-            f"Given this plant diagnosis:\n{plant_context}\n\n"
-            "Provide a detailed overview with these sections:\n"
-            "1. **What is it?** - Explain the disease/condition, its scientific name if applicable, and biological cause\n"
-            "2. **How it spreads** - Transmission vectors, environmental conditions that favour it\n"
-            "3. **Visual symptoms** - Detailed description of what to look for beyond what was detected\n"
-            "4. **Severity assessment** - How serious is this for the plant and surrounding crops?\n\n"
-            "Format using markdown. Be thorough but accessible."
-        ),
-        'prevention': (
-            f"Given this plant diagnosis:\n{plant_context}\n\n"
-            "Provide comprehensive prevention guidance with these sections:\n"
-            "1. **Immediate actions** - What to do right now\n"
-            "2. **Cultural practices** - Watering, spacing, pruning, sanitation\n"
-            "3. **Environmental controls** - Humidity, temperature, airflow management\n"
-            "4. **Resistant varieties** - Suggest disease-resistant cultivars where applicable\n"
-            "5. **Organic treatments** - Natural/biological control methods\n"
-            "6. **Chemical treatments** - Fungicides/pesticides (active ingredients, not brand names)\n"
-            "7. **Monitoring schedule** - How often to inspect and what to track\n\n"
-            "Format using markdown. Include specific, actionable steps."
-        ),
-        'damage': (
-            f"Given this plant diagnosis:\n{plant_context}\n\n"
-            "Provide a detailed future damage and risk assessment with these sections:\n"
-            "1. **Short-term impact (1-2 weeks)** - What will happen if untreated\n"
-            "2. **Medium-term impact (1-3 months)** - Disease progression timeline\n"
-            "3. **Long-term consequences** - Permanent damage, plant death risk\n"
-            "4. **Spread risk** - Which nearby plants/crops are vulnerable\n"
-            "5. **Yield/economic impact** - Estimated losses for commercial growers\n"
-            "6. **Environmental factors** - Conditions that accelerate damage\n"
-            "7. **Recovery prognosis** - Can the plant fully recover? Under what conditions?\n\n"
-            "Format using markdown. Be realistic but solution-focused."
-        )
-    }
-
-    prompt = panel_prompts.get(panel, panel_prompts['overview'])
 
     try:
-        response = groq_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            max_tokens=1500,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        content = response.choices[0].message.content
+        content = learn_panel_content(prediction['raw_class'],
+                                      panel if panel in LEARN_PANELS else 'overview')
         return jsonify({'content': content, 'panel': panel})
 
     except Exception as e:
@@ -341,7 +791,7 @@ def learn():
 
 @app.route('/chat', methods=['POST'])
 def chat():
-    prediction = session.get('prediction')
+    prediction, _ = get_diagnosis()
     if not prediction:
         return jsonify({'error': 'No active prediction in session'}), 400
 
@@ -373,13 +823,13 @@ def chat():
             for chunk in stream:
                 text = chunk.choices[0].delta.content
                 if text:
-                    escaped = text.replace('\n', '\\n')
-                    yield f"data: {escaped}\n\n"
+                    # Newlines become multi-line data fields; bytes skip Flask's per-chunk encode
+                    yield b'data: ' + text.replace('\n', '\ndata: ').encode() + b'\n\n'
 
-            yield "data: [DONE]\n\n"
+            yield b"data: [DONE]\n\n"
 
         except Exception as e:
-            yield f"data: [ERROR] {str(e)}\n\n"
+            yield f"data: [ERROR] {str(e)}\n\n".encode()
 
     return Response(
         stream_with_context(generate()),
@@ -396,4 +846,5 @@ def chat():
 load_model_and_classes()
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    start_inference()
+    app.run(host='0.0.0.0', port=5000)
\ No newline at end of file
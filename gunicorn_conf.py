@@ -0,0 +1,40 @@
+"""
+gunicorn_conf.py
+================
+Production server settings for PlantAI.
+
+Usage:
+    gunicorn -c gunicorn_conf.py app1:app
+
+The app is preloaded in the master so the model is converted and loaded
+once and shared copy-on-write by every worker. Nothing that owns threads
+(ONNX Runtime sessions, TFLite interpreters) is created before the fork;
+each worker builds and warms up its own in post_fork.
+"""
+
+import os
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+_physical_cores = (psutil.cpu_count(logical=False) if psutil else None) or os.cpu_count()
+
+bind = "0.0.0.0:5000"
+workers = max(2, _physical_cores // 2)
+threads = 4
+worker_class = "gthread"
+preload_app = True
+timeout = 60
+
+# Split the cores so inference threads don't oversubscribe: one batch thread
+# runs inference per worker, but with batching off (PREDICT_BATCH_SIZE=1)
+# every request thread owns its own interpreter
+_inference_runners = workers if int(os.environ.get("PREDICT_BATCH_SIZE", 8)) > 1 else workers * threads
+os.environ.setdefault("INFERENCE_THREADS", str(max(1, _physical_cores // _inference_runners)))
+
+
+def post_fork(server, worker):
+    from app1 import start_inference
+    start_inference()
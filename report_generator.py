@@ -21,19 +21,40 @@ Usage (in your Flask app.py):
                      download_name='PlantCare_Report.pdf')
 """
 
+import copy
+import functools
 import io
+import os
+import sys
 from datetime import datetime
+from types import MappingProxyType
+from typing import BinaryIO, Optional
 
+from PIL import Image as PILImage
+from reportlab import rl_config
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import ParagraphStyle
 from reportlab.lib.units import cm
+from reportlab.pdfbase import pdfmetrics
 from reportlab.platypus import (
-    Flowable, HRFlowable, Image, PageBreak, Paragraph,
+    HRFlowable, Image, PageBreak, Paragraph,
     SimpleDocTemplate, Spacer, Table, TableStyle,
 )
 
+# Flate-compressed streams are written as raw binary. The default ASCII85
+# wrapper adds ~25% to every stream and an extra encode pass per build.
+rl_config.useA85 = 0
+
+# Only the built-in Type1 Helvetica faces are used, so nothing is ever
+# embedded or subset. Load their metrics now rather than in the first build
+# of every worker.
+pdfmetrics.registerFontFamily("Helvetica", normal="Helvetica", bold="Helvetica-Bold",
+                              italic="Helvetica-Oblique", boldItalic="Helvetica-BoldOblique")
+for _face in ("Helvetica", "Helvetica-Bold", "Helvetica-Oblique", "Helvetica-BoldOblique"):
+    pdfmetrics.getFont(_face)
+
 # ─────────────────────────────────────────────────────────────
 # Colour palette  (matches your existing PlantCare green brand)
 # ─────────────────────────────────────────────────────────────
@@ -131,56 +152,65 @@ DISEASE_DATA = {
     # "tomato___early_blight": { ... }
 }
 
-# ─────────────────────────────────────────────────────────────
-# Custom flowables
-# ─────────────────────────────────────────────────────────────
 
-class SectionHeader(Flowable):
-    """Green section header bar with left accent stripe."""
-    def __init__(self, text, width):
-        super().__init__()
-        self._text = text
-        self.width = width
-        self.height = 28
-
-    def draw(self):
-        c = self.canv
-        c.setFillColor(LIGHT_GREEN)
-        c.rect(0, 0, self.width, self.height, fill=1, stroke=0)
-        c.setFillColor(MID_GREEN)
-        c.rect(0, 0, 5, self.height, fill=1, stroke=0)
-        c.setFillColor(DARK_GREEN)
-        c.setFont("Helvetica-Bold", 11)
-        c.drawString(14, 8, self._text)
-
-    def wrap(self, *_):
-        return self.width, self.height
-
-
-class StageBlock(Flowable):
-    """Coloured stage label bar for symptom progression."""
-    def __init__(self, text, width):
-        super().__init__()
-        self._text = text
-        self.width = width
-        self.height = 22
-
-    def draw(self):
-        c = self.canv
-        c.setFillColor(MID_GREEN)
-        c.rect(0, 0, self.width, self.height, fill=1, stroke=0)
-        c.setFillColor(WHITE)
-        c.setFont("Helvetica-Bold", 9)
-        c.drawString(10, 6, self._text)
-
-    def wrap(self, *_):
-        return self.width, self.height
+def _freeze(value):
+    """Lists -> tuples, strings -> interned, recursively."""
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _column(field):
+    return MappingProxyType({
+        sys.intern(key): _freeze(entry[field]) for key, entry in DISEASE_DATA.items()
+    })
+
 
+# Read-only, one-mapping-per-field views of DISEASE_DATA used by the report
+# builder. Repeated strings (ranks, dosages, intervals) are shared.
+DISEASE_PATHOGEN   = _column("pathogen")
+DISEASE_OVERVIEW   = _column("overview")
+DISEASE_TAXONOMY   = _column("taxonomy")
+DISEASE_SYMPTOMS   = _column("symptoms")
+DISEASE_ORGANIC    = _column("organic_treatments")
+DISEASE_CHEMICAL   = _column("chemical_treatments")
+DISEASE_RISKS      = _column("risks")
+DISEASE_PREVENTION = _column("prevention")
+
+
+def _markup(column, fn):
+    return MappingProxyType({key: _freeze(fn(value)) for key, value in column.items()})
+
+
+_ITALIC_RANKS = frozenset(("Species", "Genus"))
+
+# Paragraph markup derived from the columns, formatted once at import
+_PATHOGEN_MARKUP = _markup(DISEASE_PATHOGEN, lambda p: f"<b>Causal Pathogen:</b>  {p}")
+_TAXONOMY_MARKUP = _markup(DISEASE_TAXONOMY, lambda rows: [
+    (rank, f"<i>{val}</i>" if rank in _ITALIC_RANKS else val)
+    for rank, val in rows
+])
+_RISK_MARKUP = _markup(DISEASE_RISKS, lambda rows: [
+    (f"<b>{label}</b>", f"<b>{level}</b>", lvl_color, desc)
+    for label, level, lvl_color, desc in rows
+])
+_PREVENTION_MARKUP = _markup(DISEASE_PREVENTION, lambda items: [
+    f"<b>{i:02d}.</b>  {item}" for i, item in enumerate(items, 1)
+])
 
 # ─────────────────────────────────────────────────────────────
 # Style factory
 # ─────────────────────────────────────────────────────────────
 
+@functools.lru_cache(maxsize=256)
+def _get_style(name, font, size, color, align=TA_LEFT, leading=12):
+    """One shared ParagraphStyle per combination of (hashable) settings."""
+    return ParagraphStyle(name, fontName=font, fontSize=size, textColor=color,
+                          alignment=align, leading=leading)
+
+
 def _styles():
     def S(name, **kw):
         kw.setdefault("fontName", "Helvetica")
@@ -198,7 +228,7 @@ def _styles():
         "small":     S("sm",     fontSize=8,  textColor=MID_GRAY, leading=12),
         "sm_bold":   S("smb",   fontName="Helvetica-Bold", fontSize=8,
                         textColor=MID_GRAY, leading=12),
-        "bullet":    S("bul",   fontSize=10, leading=15,
+        "bullet":    S("bul",   fontSize=10, leading=15, spaceAfter=4,
                         leftIndent=16, bulletIndent=4),
         "th":        S("th",    fontName="Helvetica-Bold", fontSize=9,
                         textColor=WHITE, alignment=TA_CENTER, leading=13),
@@ -207,9 +237,87 @@ def _styles():
                         leftIndent=10, spaceAfter=6, textColor=DARK_GRAY),
         "disc":      S("disc",  fontSize=8,  textColor=MID_GRAY, leading=11,
                         alignment=TA_JUSTIFY),
+        "disc_head": _get_style("dh", "Helvetica-Bold", 9, MID_GRAY),
+        "footer":    _get_style("ft", "Helvetica", 7, MID_GRAY, TA_CENTER),
     }
 
 
+# Styles never change between reports, so build them once at import.
+# Flowables (Paragraph, Table, ...) are NOT cached here: they keep layout
+# and canvas state while a document is built, so sharing them between
+# concurrent requests is unsafe. Only styles and text are shared.
+_STYLES = _styles()
+
+_RISK_TABLE_STYLE = TableStyle([
+    ("BACKGROUND",    (0,0),(-1,-1), LIGHT_GRAY),
+    ("BACKGROUND",    (1,0),(1,-1),  colors.HexColor("#FFF8E1")),
+    ("GRID",          (0,0),(-1,-1), 0.3, colors.HexColor("#DEE2E6")),
+    ("VALIGN",        (0,0),(-1,-1), "MIDDLE"),
+    ("TOPPADDING",    (0,0),(-1,-1), 8),
+    ("BOTTOMPADDING", (0,0),(-1,-1), 8),
+    ("LEFTPADDING",   (0,0),(-1,-1), 8),
+])
+
+# Section header: green bar with a 5pt accent stripe on the left
+_SECTION_HEADER_STYLE = TableStyle([
+    ("BACKGROUND",    (0,0),(0,0),   MID_GREEN),
+    ("BACKGROUND",    (1,0),(1,0),   LIGHT_GREEN),
+    ("FONT",          (1,0),(1,0),   "Helvetica-Bold", 11, 11),
+    ("TEXTCOLOR",     (1,0),(1,0),   DARK_GREEN),
+    ("VALIGN",        (0,0),(-1,-1), "BOTTOM"),
+    ("LEFTPADDING",   (1,0),(1,0),   9),
+    ("BOTTOMPADDING", (0,0),(-1,-1), 8),
+])
+
+# Stage label bar for symptom progression
+_STAGE_BLOCK_STYLE = TableStyle([
+    ("BACKGROUND",    (0,0),(-1,-1), MID_GREEN),
+    ("FONT",          (0,0),(-1,-1), "Helvetica-Bold", 9, 9),
+    ("TEXTCOLOR",     (0,0),(-1,-1), WHITE),
+    ("VALIGN",        (0,0),(-1,-1), "BOTTOM"),
+    ("LEFTPADDING",   (0,0),(-1,-1), 10),
+    ("BOTTOMPADDING", (0,0),(-1,-1), 6),
+])
+
+DISCLAIMER_TEXT = (
+    "This report was generated by PlantCare AI using a MobileNetV2 deep-learning model "
+    "trained on the PlantVillage dataset. The AI confidence score reflects probabilistic "
+    "model output and does not constitute a definitive agronomic diagnosis. Results may "
+    "not account for co-infections, growth stage variation, or local environmental factors. "
+    "Treatment recommendations are for informational purposes only and are based on "
+    "generalised agronomic literature. Verify pesticide registrations and pre-harvest "
+    "intervals with local regulatory authorities before use. For critical crop-protection "
+    "decisions consult a qualified plant pathologist or certified crop adviser. "
+    "PlantCare AI and its developers accept no liability for crop losses, regulatory "
+    "violations, or adverse outcomes arising from reliance on this report."
+)
+
+
+# ─────────────────────────────────────────────────────────────
+# Page geometry
+# ─────────────────────────────────────────────────────────────
+
+LEFT_MARGIN = RIGHT_MARGIN = 2*cm
+TOP_MARGIN, BOTTOM_MARGIN  = 1.5*cm, 2*cm
+
+# Frame width (== SimpleDocTemplate.width) and every column layout derived
+# from it, computed once instead of per table
+_DOC_W = A4[0] - LEFT_MARGIN - RIGHT_MARGIN
+
+
+def _cols(*fractions):
+    return tuple(_DOC_W * f for f in fractions)
+
+
+_SECTION_HEADER_COLS = (5, _DOC_W - 5)
+_FULL_COLS           = (_DOC_W,)
+_SUMMARY_COLS        = _cols(0.28, 0.24, 0.20, 0.28)
+_TAXONOMY_COLS       = _cols(0.30, 0.70)
+_ORGANIC_COLS        = _cols(0.38, 0.28, 0.34)
+_CHEMICAL_COLS       = _cols(0.22, 0.18, 0.18, 0.42)
+_RISK_COLS           = _cols(0.24, 0.14, 0.62)
+
+
 # ─────────────────────────────────────────────────────────────
 # Table helper
 # ─────────────────────────────────────────────────────────────
@@ -230,149 +338,136 @@ def _make_table(rows, col_widths, header_bg=DARK_GREEN,
     return t
 
 
+def _section_header(text):
+    return Table([["", text]], colWidths=_SECTION_HEADER_COLS, rowHeights=[28],
+                 style=_SECTION_HEADER_STYLE, hAlign="LEFT")
+
+
+def _stage_block(text):
+    return Table([[text]], colWidths=_FULL_COLS, rowHeights=[22],
+                 style=_STAGE_BLOCK_STYLE, hAlign="LEFT")
+
+
 # ─────────────────────────────────────────────────────────────
-# Main public function
+# Analysed image
 # ─────────────────────────────────────────────────────────────
 
-def generate_enhanced_report(
-    plant: str,
-    condition: str,
-    confidence: float,
-    image_path: str = None,
-    generated_on: str = None,
-    report_id: str = None,
-) -> bytes:
+IMAGE_BOX = (7*cm, 5*cm)
+IMAGE_PX  = (410, 295)                 # IMAGE_BOX at ~150 DPI
+
+
+@functools.lru_cache(maxsize=128)
+def _report_image_jpeg(image_path, mtime):
     """
-    Build and return the enhanced PDF as raw bytes.
+    Downscale the leaf image to what the 7 x 5 cm box can show and return it
+    as JPEG bytes. Keyed on mtime so a replaced file is re-read; bytes rather
+    than a BytesIO so concurrent builds can share the cached value.
+    """
+    with PILImage.open(image_path) as im:
+        im = im.convert("RGB")
+        im.thumbnail(IMAGE_PX, PILImage.LANCZOS)
+        buf = io.BytesIO()
+        im.save(buf, format="JPEG", quality=75, optimize=True)
+    return buf.getvalue()
 
-    Parameters
-    ----------
-    plant        : e.g. "Strawberry"
-    condition    : e.g. "Leaf scorch"
-    confidence   : float, e.g. 97.77
-    image_path   : absolute path to the analysed leaf image (optional)
-    generated_on : human-readable datetime string (defaults to now)
-    report_id    : custom report ID string (auto-generated if omitted)
+
+# ─────────────────────────────────────────────────────────────
+# Header banner (drawn straight onto the first page)
+# ─────────────────────────────────────────────────────────────
+
+# (text, style, fill, top padding, bottom padding) for each banner band
+_BANNER_BANDS = (
+    ("PlantCare AI",                            "title",    DARK_GREEN, 18, 6),
+    ("Enhanced Plant Disease Diagnosis Report", "subtitle", MID_GREEN,  6,  14),
+)
+_BANNER_HEIGHT = sum(_STYLES[st].leading + tp + bp for _, st, _, tp, bp in _BANNER_BANDS)
+
+
+def _draw_header_banner(canv, doc):
+    """
+    onFirstPage callback. The banner text is fixed, so it is drawn with plain
+    canvas calls instead of going through Table/Paragraph layout; the story
+    reserves _BANNER_HEIGHT for it at the top of the frame.
     """
+    x = doc.leftMargin
+    y = doc.pagesize[1] - doc.topMargin - 6    # below the Frame's top padding
+    canv.saveState()
+    for text, st, fill, top_pad, bottom_pad in _BANNER_BANDS:
+        style = _STYLES[st]
+        h = top_pad + style.leading + bottom_pad
+        y -= h
+        canv.setFillColor(fill)
+        canv.rect(x, y, doc.width, h, fill=1, stroke=0)
+        canv.setFillColor(style.textColor)
+        canv.setFont(style.fontName, style.fontSize)
+        canv.drawCentredString(
+            x + doc.width / 2,
+            y + h - top_pad - style.fontSize,
+            text)
+    canv.restoreState()
 
-    generated_on = generated_on or datetime.now().strftime("%B %d, %Y at %H:%M")
-    report_id    = report_id    or datetime.now().strftime("PC-%Y-%m%d-%H%M")
 
-    # Look up disease data -------------------------------------------------
-    key = f"{plant}___{condition}".lower().replace(" ", "_").replace("___", "___")
-    # Try a few normalisation attempts
-    data = (
-        DISEASE_DATA.get(key) or
-        DISEASE_DATA.get(f"{plant.lower()}___{condition.lower().replace(' ','_')}") or
-        DISEASE_DATA.get(f"{plant.lower()}___{'_'.join(condition.lower().split())}")
-    )
-    if not data:
-        raise ValueError(
-            f"No disease data found for '{plant} – {condition}'. "
-            f"Add an entry to DISEASE_DATA in report_generator.py."
-        )
+# ─────────────────────────────────────────────────────────────
+# Disease-specific sections (cached per disease)
+# ─────────────────────────────────────────────────────────────
 
-    S   = _styles()
-    buf = io.BytesIO()
+def _aliases(key):
+    """Spellings of a DISEASE_DATA key that plant/condition input may produce."""
+    plant, condition = key.split("___")
+    for p in {plant, plant.replace("_", " "), plant.replace(" ", "_")}:
+        for c in {condition, condition.replace("_", " "), condition.replace(" ", "_")}:
+            yield f"{p}___{c}"
 
-    doc = SimpleDocTemplate(
-        buf,
-        pagesize=A4,
-        rightMargin=2*cm, leftMargin=2*cm,
-        topMargin=1.5*cm, bottomMargin=2*cm,
-        title="PlantCare AI — Enhanced Diagnosis Report",
-        author="PlantCare AI",
-    )
-    W     = doc.width
-    story = []
 
-    # ── Header banner ──────────────────────────────────────────────────────
-    hdr = Table(
-        [[Paragraph("PlantCare AI", S["title"])]],
-        colWidths=[W],
-    )
-    hdr.setStyle(TableStyle([
-        ("BACKGROUND",    (0,0),(-1,-1), DARK_GREEN),
-        ("TOPPADDING",    (0,0),(-1,-1), 18),
-        ("BOTTOMPADDING", (0,0),(-1,-1), 6),
-    ]))
-    story.append(hdr)
+# Every accepted spelling -> canonical DISEASE_DATA key
+_ALIAS_INDEX = MappingProxyType({
+    alias: key for key in DISEASE_PATHOGEN for alias in _aliases(key)
+})
 
-    sub = Table(
-        [[Paragraph("Enhanced Plant Disease Diagnosis Report", S["subtitle"])]],
-        colWidths=[W],
-    )
-    sub.setStyle(TableStyle([
-        ("BACKGROUND",    (0,0),(-1,-1), MID_GREEN),
-        ("TOPPADDING",    (0,0),(-1,-1), 6),
-        ("BOTTOMPADDING", (0,0),(-1,-1), 14),
-    ]))
-    story.append(sub)
-    story.append(Spacer(1, 12))
 
-    # ── Summary card ───────────────────────────────────────────────────────
-    summary = [
-        [Paragraph(h, S["th"]) for h in
-         ["Plant Type", "Condition Detected", "AI Confidence", "Report ID"]],
-        [
-            Paragraph(plant, S["td"]),
-            Paragraph(f'<font color="#C0392B"><b>{condition}</b></font>', S["td"]),
-            Paragraph(f"<b>{confidence:.2f}%</b>", S["td"]),
-            Paragraph(report_id, S["small"]),
-        ],
-    ]
-    story.append(_make_table(summary, [W*0.28, W*0.24, W*0.20, W*0.28]))
-    story.append(Spacer(1, 5))
-    story.append(Paragraph(
-        f"Generated on {generated_on}  ·  Model: MobileNetV2 (Transfer Learning) "
-        f"— PlantVillage Dataset", S["small"]))
-    story.append(Spacer(1, 16))
+def _resolve_key(plant, condition):
+    """Return the DISEASE_DATA key for plant/condition, or None."""
+    norm = f"{plant}___{condition}".lower()
+    return _ALIAS_INDEX.get(norm) or _ALIAS_INDEX.get("_".join(norm.split()))
 
-    # ── Analysed image (if provided) ────────────────────────────────────────
-    if image_path:
-        try:
-            img = Image(image_path, width=7*cm, height=5*cm, kind='proportional')
-            img_table = Table([[img]], colWidths=[W])
-            img_table.setStyle(TableStyle([
-                ("ALIGN",         (0,0),(-1,-1), "CENTER"),
-                ("BACKGROUND",    (0,0),(-1,-1), LIGHT_GRAY),
-                ("TOPPADDING",    (0,0),(-1,-1), 8),
-                ("BOTTOMPADDING", (0,0),(-1,-1), 8),
-            ]))
-            story.append(Paragraph("<b>Analysed Leaf Image</b>", S["bold"]))
-            story.append(Spacer(1, 4))
-            story.append(img_table)
-            story.append(Spacer(1, 14))
-        except Exception:
-            pass  # skip image silently if path is bad
+
+def _build_static_sections(key):
+    """
+    Build sections 1–5 for a disease. They depend only on the disease entry,
+    so they are built once per disease into _STATIC_SECTIONS and reused.
+
+    Callers must not put these flowables in a story directly: pass each one
+    through _fresh() so every build gets its own copies.
+    """
+    S     = _STYLES
+    story = []
 
     # ══════════════════════════════════════════════════════════════════════
     # Section 1 — Scientific Overview
     # ══════════════════════════════════════════════════════════════════════
-    story.append(SectionHeader("1.  Scientific Overview & Pathogen Information", W))
+    story.append(_section_header("1.  Scientific Overview & Pathogen Information"))
     story.append(Spacer(1, 10))
-    story.append(Paragraph(f"<b>Causal Pathogen:</b>  {data['pathogen']}", S["bold"]))
+    story.append(Paragraph(_PATHOGEN_MARKUP[key], S["bold"]))
     story.append(Spacer(1, 6))
-    story.append(Paragraph(data["overview"], S["body"]))
+    story.append(Paragraph(DISEASE_OVERVIEW[key], S["body"]))
     story.append(Spacer(1, 10))
 
     story.append(Paragraph("<b>Taxonomic Classification</b>", S["bold"]))
     story.append(Spacer(1, 5))
     tax_rows = [[Paragraph("<b>Rank</b>", S["th"]),
                  Paragraph("<b>Classification</b>", S["th"])]]
-    for rank, val in data["taxonomy"]:
-        disp = f"<i>{val}</i>" if rank in ("Species", "Genus") else val
+    for rank, disp in _TAXONOMY_MARKUP[key]:
         tax_rows.append([Paragraph(rank, S["sm_bold"]), Paragraph(disp, S["td"])])
-    story.append(_make_table(tax_rows, [W*0.30, W*0.70]))
+    story.append(_make_table(tax_rows, _TAXONOMY_COLS))
     story.append(Spacer(1, 18))
 
     # ══════════════════════════════════════════════════════════════════════
     # Section 2 — Symptom Progression
     # ══════════════════════════════════════════════════════════════════════
-    story.append(SectionHeader("2.  Symptom Progression", W))
+    story.append(_section_header("2.  Symptom Progression"))
     story.append(Spacer(1, 10))
-    for stage, desc in data["symptoms"]:
-        story.append(StageBlock(stage, W))
+    for stage, desc in DISEASE_SYMPTOMS[key]:
+        story.append(_stage_block(stage))
         story.append(Paragraph(desc, S["stage_desc"]))
         story.append(Spacer(1, 5))
     story.append(Spacer(1, 10))
@@ -380,16 +475,16 @@ def generate_enhanced_report(
     # ══════════════════════════════════════════════════════════════════════
     # Section 3a — Organic Treatments
     # ══════════════════════════════════════════════════════════════════════
-    story.append(SectionHeader("3.  Treatment Protocols", W))
+    story.append(_section_header("3.  Treatment Protocols"))
     story.append(Spacer(1, 10))
 
     story.append(Paragraph("<b>3a.  Organic / Biological Treatments</b>", S["bold"]))
     story.append(Spacer(1, 5))
     org_rows = [[Paragraph(h, S["th"]) for h in
-                 ["Product / Treatment", "Dosage", "Application Frequency"]]]
-    for row in data["organic_treatments"]:
+                 ("Product / Treatment", "Dosage", "Application Frequency")]]
+    for row in DISEASE_ORGANIC[key]:
         org_rows.append([Paragraph(c, S["td"]) for c in row])
-    story.append(_make_table(org_rows, [W*0.38, W*0.28, W*0.34]))
+    story.append(_make_table(org_rows, _ORGANIC_COLS))
     story.append(Spacer(1, 12))
 
     # ── Section 3b — Chemical Treatments ──────────────────────────────────
@@ -400,11 +495,11 @@ def generate_enhanced_report(
         "resistance. Strictly observe pre-harvest intervals (PHI).", S["small"]))
     story.append(Spacer(1, 5))
     chem_rows = [[Paragraph(h, S["th"]) for h in
-                  ["Active Ingredient", "Trade Name", "Dosage", "Application Notes"]]]
-    for row in data["chemical_treatments"]:
+                  ("Active Ingredient", "Trade Name", "Dosage", "Application Notes")]]
+    for row in DISEASE_CHEMICAL[key]:
         chem_rows.append([Paragraph(c, S["td"]) for c in row])
     story.append(_make_table(
-        chem_rows, [W*0.22, W*0.18, W*0.18, W*0.42],
+        chem_rows, _CHEMICAL_COLS,
         header_bg=colors.HexColor("#6B2737"),
         row_colors=(WHITE, colors.HexColor("#FFF5F5")),
         grid_color=colors.HexColor("#FFBDBD"),
@@ -414,69 +509,206 @@ def generate_enhanced_report(
     # ══════════════════════════════════════════════════════════════════════
     # Section 4 — Risk Assessment
     # ══════════════════════════════════════════════════════════════════════
-    story.append(SectionHeader("4.  Risk Assessment & Spread Patterns", W))
+    story.append(_section_header("4.  Risk Assessment & Spread Patterns"))
     story.append(Spacer(1, 10))
-    for label, level, lvl_color, desc in data["risks"]:
-        risk_row = [[
-            Paragraph(f"<b>{label}</b>", S["bold"]),
-            Paragraph(f"<b>{level}</b>", ParagraphStyle(
-                "lvl", fontName="Helvetica-Bold", fontSize=10,
-                textColor=lvl_color, alignment=TA_CENTER, leading=14)),
+    risk_rows = [
+        [
+            Paragraph(label, S["bold"]),
+            Paragraph(level, _get_style("lvl", "Helvetica-Bold", 10, lvl_color, TA_CENTER, 14)),
             Paragraph(desc, S["body"]),
-        ]]
-        rt = Table(risk_row, colWidths=[W*0.24, W*0.14, W*0.62])
-        rt.setStyle(TableStyle([
-            ("BACKGROUND",    (0,0),(-1,-1), LIGHT_GRAY),
-            ("BACKGROUND",    (1,0),(1,0),   colors.HexColor("#FFF8E1")),
-            ("GRID",          (0,0),(-1,-1), 0.3, colors.HexColor("#DEE2E6")),
-            ("VALIGN",        (0,0),(-1,-1), "MIDDLE"),
-            ("TOPPADDING",    (0,0),(-1,-1), 8),
-            ("BOTTOMPADDING", (0,0),(-1,-1), 8),
-            ("LEFTPADDING",   (0,0),(-1,-1), 8),
-        ]))
-        story.append(rt)
-        story.append(Spacer(1, 4))
-    story.append(Spacer(1, 14))
+        ]
+        for label, level, lvl_color, desc in _RISK_MARKUP[key]
+    ]
+    story.append(Table(risk_rows, colWidths=_RISK_COLS,
+                       style=_RISK_TABLE_STYLE))
+    story.append(Spacer(1, 18))
 
     # ══════════════════════════════════════════════════════════════════════
     # Section 5 — Prevention Guidelines
     # ══════════════════════════════════════════════════════════════════════
-    story.append(SectionHeader("5.  Prevention Guidelines", W))
+    story.append(_section_header("5.  Prevention Guidelines"))
     story.append(Spacer(1, 10))
-    for i, item in enumerate(data["prevention"], 1):
-        story.append(Paragraph(f"<b>{i:02d}.</b>  {item}", S["bullet"]))
-        story.append(Spacer(1, 4))
+    story.extend(Paragraph(item, S["bullet"]) for item in _PREVENTION_MARKUP[key])
     story.append(Spacer(1, 18))
 
+    return tuple(story)
+
+
+def _fresh(flowable):
+    """
+    Per-build copy of a cached flowable. Platypus stores wrap results and the
+    current canvas on the flowable while drawing, so each build needs its own
+    instance. A shallow copy is enough: the parsed paragraph fragments and
+    styles are only read, so they stay shared. Table cells are copied the
+    same way.
+    """
+    clone = copy.copy(flowable)
+    if isinstance(flowable, Table):
+        clone._cellvalues = [[_fresh(c) for c in row] for row in flowable._cellvalues]
+    return clone
+
+
+@functools.lru_cache(maxsize=512)
+def _parsed_paragraph(text, style):
+    return Paragraph(text, style)
+
+
+def _p(text, style):
+    """
+    Paragraph for text that repeats across reports (headers, disclaimer,
+    plant/condition names). The markup is parsed once per (text, style) and
+    each call gets its own shallow copy, as with _fresh().
+    """
+    return copy.copy(_parsed_paragraph(text, style))
+
+
+# Every disease's sections (treatment rows and all), built at import so
+# preloaded workers share the parsed flowables and no request builds them.
+# They stay prototypes: builds only ever see _fresh() copies.
+_STATIC_SECTIONS = MappingProxyType({
+    key: _build_static_sections(key) for key in DISEASE_PATHOGEN
+})
+
+
+# ─────────────────────────────────────────────────────────────
+# Main public function
+# ─────────────────────────────────────────────────────────────
+
+def generate_enhanced_report(
+    plant: str,
+    condition: str,
+    confidence: float,
+    image_path: str = None,
+    generated_on: str = None,
+    report_id: str = None,
+    out_stream: Optional[BinaryIO] = None,
+) -> Optional[bytes]:
+    """
+    Build and return the enhanced PDF as raw bytes.
+
+    Parameters
+    ----------
+    plant        : e.g. "Strawberry"
+    condition    : e.g. "Leaf scorch"
+    confidence   : float, e.g. 97.77
+    image_path   : absolute path to the analysed leaf image (optional)
+    generated_on : human-readable datetime string (defaults to now)
+    report_id    : custom report ID string (auto-generated if omitted)
+    out_stream   : writable binary file-like object; when given the PDF is
+                   written straight into it and None is returned
+    """
+
+    if not (generated_on and report_id):
+        now = datetime.now()
+        generated_on = generated_on or now.strftime("%B %d, %Y at %H:%M")
+        report_id    = report_id    or now.strftime("PC-%Y-%m%d-%H%M")
+
+    # Look up disease data -------------------------------------------------
+    key = _resolve_key(plant, condition)
+    if key is None:
+        raise ValueError(
+            f"No disease data found for '{plant} – {condition}'. "
+            f"Add an entry to DISEASE_DATA in report_generator.py."
+        )
+
+    S   = _STYLES
+    buf = out_stream if out_stream is not None else io.BytesIO()
+
+    doc = SimpleDocTemplate(
+        buf,
+        pagesize=A4,
+        rightMargin=RIGHT_MARGIN, leftMargin=LEFT_MARGIN,
+        topMargin=TOP_MARGIN, bottomMargin=BOTTOM_MARGIN,
+        pageCompression=1,
+        title="PlantCare AI — Enhanced Diagnosis Report",
+        author="PlantCare AI",
+    )
+    story = []
+
+    # ── Header banner (see _draw_header_banner) ────────────────────────────
+    story.append(Spacer(1, _BANNER_HEIGHT + 12))
+
+    # ── Summary card ───────────────────────────────────────────────────────
+    summary = [
+        [_p(h, S["th"]) for h in
+         ("Plant Type", "Condition Detected", "AI Confidence", "Report ID")],
+        [
+            _p(plant, S["td"]),
+            _p(f'<font color="#C0392B"><b>{condition}</b></font>', S["td"]),
+            Paragraph(f"<b>{confidence:.2f}%</b>", S["td"]),
+            Paragraph(report_id, S["small"]),
+        ],
+    ]
+    story.append(_make_table(summary, _SUMMARY_COLS))
+    story.append(Spacer(1, 5))
+    story.append(Paragraph(
+        f"Generated on {generated_on}  ·  Model: MobileNetV2 (Transfer Learning) "
+        f"— PlantVillage Dataset", S["small"]))
+    story.append(Spacer(1, 16))
+
+    # ── Analysed image (if provided) ────────────────────────────────────────
+    if image_path:
+        try:
+            jpeg = _report_image_jpeg(image_path, os.path.getmtime(image_path))
+            img = Image(io.BytesIO(jpeg), *IMAGE_BOX, kind='proportional')
+            img_table = Table([[img]], colWidths=_FULL_COLS)
+            img_table.setStyle(TableStyle([
+                ("ALIGN",         (0,0),(-1,-1), "CENTER"),
+                ("BACKGROUND",    (0,0),(-1,-1), LIGHT_GRAY),
+                ("TOPPADDING",    (0,0),(-1,-1), 8),
+                ("BOTTOMPADDING", (0,0),(-1,-1), 8),
+            ]))
+            story.append(_p("<b>Analysed Leaf Image</b>", S["bold"]))
+            story.append(Spacer(1, 4))
+            story.append(img_table)
+            story.append(Spacer(1, 14))
+        except Exception:
+            pass  # skip image silently if path is bad
+
+    # ── Sections 1–5: identical for every report on this disease ───────────
+    story.extend(_fresh(f) for f in _STATIC_SECTIONS[key])
+
     # ── Footer disclaimer ─────────────────────────────────────────────────
-    story.append(HRFlowable(width=W, thickness=0.8, color=ACCENT_GREEN))
+    story.append(HRFlowable(width=_DOC_W, thickness=0.8, color=ACCENT_GREEN))
     story.append(Spacer(1, 8))
-    story.append(Paragraph("Disclaimer & Limitations", ParagraphStyle(
-        "dh", fontName="Helvetica-Bold", fontSize=9, textColor=MID_GRAY)))
+    story.append(_p("Disclaimer & Limitations", S["disc_head"]))
     story.append(Spacer(1, 4))
-    story.append(Paragraph(
-        "This report was generated by PlantCare AI using a MobileNetV2 deep-learning model "
-        "trained on the PlantVillage dataset. The AI confidence score reflects probabilistic "
-        "model output and does not constitute a definitive agronomic diagnosis. Results may "
-        "not account for co-infections, growth stage variation, or local environmental factors. "
-        "Treatment recommendations are for informational purposes only and are based on "
-        "generalised agronomic literature. Verify pesticide registrations and pre-harvest "
-        "intervals with local regulatory authorities before use. For critical crop-protection "
-        "decisions consult a qualified plant pathologist or certified crop adviser. "
-        "PlantCare AI and its developers accept no liability for crop losses, regulatory "
-        "violations, or adverse outcomes arising from reliance on this report.",
-        S["disc"]))
+    story.append(_p(DISCLAIMER_TEXT, S["disc"]))
     story.append(Spacer(1, 8))
     story.append(Paragraph(
         f"© 2026 PlantCare AI  ·  Smart Bridge Hyderabad  ·  "
         f"Report ID: {report_id}  ·  {generated_on}",
-        ParagraphStyle("ft", fontName="Helvetica", fontSize=7,
-                       textColor=MID_GRAY, alignment=TA_CENTER)))
+        S["footer"]))
 
-    doc.build(story)
+    doc.build(story, onFirstPage=_draw_header_banner)
+    if out_stream is not None:
+        return None
     return buf.getvalue()
 
 
+# ─────────────────────────────────────────────────────────────
+# Batch generation
+# ─────────────────────────────────────────────────────────────
+
+def _gen_one(job):
+    return generate_enhanced_report(**job)
+
+
+def generate_batch(jobs, max_workers=None):
+    """
+    Build many reports in parallel worker processes.
+
+    jobs is a list of keyword-argument dicts for generate_enhanced_report
+    (out_stream is not supported); the PDFs are returned as bytes in the
+    same order. A job that fails raises its exception here.
+    """
+    # Deferred: pulls in multiprocessing, which only batch callers need
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=max_workers) as ex:
+        return list(ex.map(_gen_one, jobs))
+
+
 # ─────────────────────────────────────────────────────────────
 # Quick local test  →  python report_generator.py
 # ─────────────────────────────────────────────────────────────